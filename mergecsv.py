@@ -1,28 +1,249 @@
+import time
+_IMPORT_START = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
-import pandas as pd
 import re
+import math
+import sys
 from pathlib import Path
-import numpy as np
 import threading
+import sqlite3
+import datetime
+
+# numpy and pandas are imported lazily (see CSVConverterGUI.preload_libraries)
+# so the window appears before these slow imports complete
+_IMPORT_END = time.perf_counter()
+
+WINDOW_WIDTH = 800
+WINDOW_HEIGHT = 600
+
+CATALOG_FILENAME = 'spectra_catalog.sqlite'
+CATALOG_BATCH_SIZE = 500  # Files indexed per transaction, so interrupted scans keep progress
+
+class SpectraCatalog:
+    """SQLite index of spectral file metadata, used to select subsets of large directories"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS spectra (
+            name TEXT PRIMARY KEY,
+            title TEXT,
+            x_min REAL,
+            x_max REAL,
+            points INTEGER,
+            size INTEGER,
+            mtime_ns INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS metadata (
+            name TEXT,
+            key TEXT,
+            value TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_spectra_range ON spectra (x_min, x_max);
+        CREATE INDEX IF NOT EXISTS idx_spectra_mtime ON spectra (mtime_ns);
+        CREATE INDEX IF NOT EXISTS idx_metadata_name ON metadata (name);
+        CREATE INDEX IF NOT EXISTS idx_metadata_key_value ON metadata (key, value);
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        conn = self.connect()
+        try:
+            conn.executescript(self.SCHEMA)
+        finally:
+            conn.close()
+
+    def connect(self):
+        """Open a new connection (sqlite connections cannot be shared across threads)"""
+        return sqlite3.connect(self.db_path)
+
+    def update(self, csv_files, parse_file):
+        """Index new or changed files and drop files that no longer exist.
+
+        Files are fingerprinted by size and modification time, so unchanged
+        files are not re-parsed. Unparseable files are recorded with NULL data
+        so they are skipped too until they change, but still counted as failed.
+        Changes are committed every CATALOG_BATCH_SIZE files.
+        Returns (indexed, unchanged, failed) counts.
+        """
+        indexed = unchanged = failed = 0
+        conn = self.connect()
+        try:
+            known = {name: (size, mtime_ns) for name, size, mtime_ns
+                     in conn.execute("SELECT name, size, mtime_ns FROM spectra")}
+            unparseable = {name for (name,)
+                           in conn.execute("SELECT name FROM spectra WHERE points IS NULL")}
+            present = set()
+            pending = 0
+
+            for file_path in csv_files:
+                name = file_path.name
+                try:
+                    stat = file_path.stat()
+                except OSError:
+                    # Deleted or unreadable since the directory was scanned;
+                    # left out of present so its old entry is dropped below
+                    failed += 1
+                    continue
+
+                present.add(name)
+                fingerprint = (stat.st_size, stat.st_mtime_ns)
+                if known.get(name) == fingerprint:
+                    if name in unparseable:
+                        failed += 1
+                    else:
+                        unchanged += 1
+                    continue
+
+                conn.execute("DELETE FROM metadata WHERE name = ?", (name,))
+                try:
+                    metadata, x_data, y_data = parse_file(file_path)
+                except Exception:
+                    # Record the fingerprint with no data so the file is not re-parsed
+                    conn.execute(
+                        "INSERT OR REPLACE INTO spectra VALUES (?, NULL, NULL, NULL, NULL, ?, ?)",
+                        (name, *fingerprint)
+                    )
+                    failed += 1
+                else:
+                    x_min = min(x_data) if x_data else None
+                    x_max = max(x_data) if x_data else None
+                    conn.execute(
+                        "INSERT OR REPLACE INTO spectra VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (name, metadata.get('TITLE', ''), x_min, x_max, len(x_data), *fingerprint)
+                    )
+                    conn.executemany(
+                        "INSERT INTO metadata VALUES (?, ?, ?)",
+                        [(name, key, value) for key, value in metadata.items()]
+                    )
+                    indexed += 1
+
+                pending += 1
+                if pending >= CATALOG_BATCH_SIZE:
+                    conn.commit()
+                    pending = 0
+
+            stale = [(name,) for name in known if name not in present]
+            conn.executemany("DELETE FROM spectra WHERE name = ?", stale)
+            conn.executemany("DELETE FROM metadata WHERE name = ?", stale)
+            conn.commit()
+        finally:
+            conn.close()
+
+        return indexed, unchanged, failed
+
+    def query(self, title=None, covers_min=None, covers_max=None, modified_since=None,
+              metadata=None):
+        """Return the names of parseable files matching all of the given filters.
+
+        title is matched as a case-insensitive substring, covers_min/covers_max
+        require the spectrum range to include that wavelength span,
+        modified_since is a datetime compared with the file modification time,
+        and metadata maps header keys to the exact values they must have.
+        """
+        # Files that failed to parse have NULL points and never match
+        clauses = ["points IS NOT NULL"]
+        params = []
+        if title:
+            clauses.append("instr(lower(title), lower(?)) > 0")
+            params.append(title)
+        if covers_min is not None:
+            clauses.append("x_min <= ?")
+            params.append(covers_min)
+        if covers_max is not None:
+            clauses.append("x_max >= ?")
+            params.append(covers_max)
+        if modified_since is not None:
+            clauses.append("mtime_ns >= ?")
+            params.append(int(modified_since.timestamp() * 1_000_000_000))
+        for key, value in (metadata or {}).items():
+            clauses.append("name IN (SELECT name FROM metadata WHERE key = ? AND value = ?)")
+            params.extend([key, value])
+
+        sql = "SELECT name FROM spectra WHERE " + " AND ".join(clauses)
+
+        conn = self.connect()
+        try:
+            return {name for (name,) in conn.execute(sql, params)}
+        finally:
+            conn.close()
 
 class CSVConverterGUI:
-    def __init__(self, root):
+    def __init__(self, root, startup_timing=False):
         self.root = root
         self.root.title("CSV Spectra Merge and Combine")
-        self.root.geometry("800x600")
+        self.root.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
         self.root.resizable(True, True)
         
         # Variables
         self.selected_directory = tk.StringVar()
         self.csv_files = []
         self.file_vars = {}  # Dictionary to store checkbox variables
+        self.catalog = None  # SpectraCatalog for the selected directory, once indexed
+        self.indexing_directories = set()  # Directories with an index thread running
+        self.startup_timing = startup_timing
+        self.ui_start = None  # Set by main when measuring startup
+        self.ui_end = None
+        
+        # Fallback format until the system locale is detected after startup
+        self.default_separator = "semicolon"
+        self.default_decimal = "comma"
+        self.detected_region = "Default (European format)"
+        
+        self.setup_ui()
+        
+        # Locale detection and heavy imports run once the window is shown
+        self.root.after_idle(self.finish_startup)
         
+    def finish_startup(self):
+        """Detect locale, log welcome message and start loading numerical libraries"""
         # Auto-detect system locale and set default format
         self.detect_system_locale()
+        self.separator_var.set(self.default_separator)
+        self.decimal_var.set(self.default_decimal)
+        
+        # Inserted as one block to avoid a layout pass per line
+        self.log_lines([
+            "Welcome to CSV Spectra Converter!",
+            f"🌍 Auto-detected region: {self.detected_region}",
+            f"📄 Default CSV format: {self.default_separator} separator, {self.default_decimal} decimal",
+            "💡 You can change format using the presets or manual selection below",
+            "",
+            "1. Select a directory containing CSV spectral files",
+            "2. Choose which files to convert (or filter them by title, range and date)",
+            "3. Adjust CSV format options if needed",
+            "4. Click 'Convert to CSV' to generate unified output files",
+        ])
+        
+        thread = threading.Thread(target=self.preload_libraries)
+        thread.daemon = True
+        thread.start()
         
-        self.setup_ui()
+        if self.startup_timing:
+            interactive = time.perf_counter()
+            self.report_timing("module imports", _IMPORT_END - _IMPORT_START)
+            self.report_timing("UI build", self.ui_end - self.ui_start)
+            self.report_timing("window interactive", interactive - _IMPORT_START)
+        
+    def preload_libraries(self):
+        """Import numpy and pandas in background so the first conversion starts quickly"""
+        start = time.perf_counter()
+        try:
+            import numpy
+            import pandas
+        except ImportError as e:
+            self.log(f"⚠ {str(e)} - install pandas and numpy before converting")
+            return
+        
+        if self.startup_timing:
+            self.report_timing("numpy/pandas background import", time.perf_counter() - start)
+            
+    def report_timing(self, label, seconds):
+        """Report a startup timing measurement on stdout and in the log"""
+        message = f"⏱ {label}: {seconds * 1000:.0f} ms"
+        print(message)
+        self.log(message)
         
     def detect_system_locale(self):
         """Auto-detect system locale and set appropriate CSV format defaults"""
@@ -151,6 +372,36 @@ class CSVConverterGUI:
             canvas.yview_scroll(int(-1*(event.delta/120)), "units")
         canvas.bind("<MouseWheel>", _on_mousewheel)
         
+        # Catalog filter for selecting subsets of large directories
+        filter_frame = ttk.Frame(files_frame)
+        filter_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        ttk.Label(filter_frame, text="Title contains:").pack(side=tk.LEFT, padx=(0, 5))
+        self.title_filter_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.title_filter_var, width=15).pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Label(filter_frame, text="Covers (nm):").pack(side=tk.LEFT, padx=(0, 5))
+        self.range_min_filter_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.range_min_filter_var, width=7).pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text="-").pack(side=tk.LEFT, padx=2)
+        self.range_max_filter_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.range_max_filter_var, width=7).pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Label(filter_frame, text="Modified in last (days):").pack(side=tk.LEFT, padx=(0, 5))
+        self.days_filter_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.days_filter_var, width=5).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.filter_button = ttk.Button(filter_frame, text="Apply Filter",
+                                       command=self.apply_catalog_filter, state="disabled")
+        self.filter_button.pack(side=tk.RIGHT)
+        
+        header_filter_frame = ttk.Frame(files_frame)
+        header_filter_frame.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
+        
+        ttk.Label(header_filter_frame, text="Header fields (KEY=value; ...):").pack(side=tk.LEFT, padx=(0, 5))
+        self.header_filter_var = tk.StringVar()
+        ttk.Entry(header_filter_frame, textvariable=self.header_filter_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
         # CSV format selection
         format_frame = ttk.LabelFrame(main_frame, text="3. CSV Format Options", padding="10")
         format_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
@@ -215,17 +466,6 @@ class CSVConverterGUI:
         self.log_text = scrolledtext.ScrolledText(log_frame, height=10, width=70)
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
-        # Initial log message - Enhanced like converter2.py
-        self.log("Welcome to CSV Spectra Converter!")
-        self.log(f"🌍 Auto-detected region: {self.detected_region}")
-        self.log(f"📄 Default CSV format: {self.default_separator} separator, {self.default_decimal} decimal")
-        self.log("💡 You can change format using the presets or manual selection below")
-        self.log("")
-        self.log("1. Select a directory containing CSV spectral files")
-        self.log("2. Choose which files to convert")
-        self.log("3. Adjust CSV format options if needed")
-        self.log("4. Click 'Convert to CSV' to generate unified output files")
-        
     def set_format_preset(self, preset_type):
         """Set format presets for different regions/applications"""
         if preset_type == "us":
@@ -246,12 +486,17 @@ class CSVConverterGUI:
         
     def log(self, message):
         """Add message to log with timestamp"""
-        import datetime
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
         self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
         self.log_text.see(tk.END)
         self.root.update_idletasks()
         
+    def log_lines(self, messages):
+        """Add several messages to log at once, leaving redraw to the event loop"""
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        self.log_text.insert(tk.END, "".join(f"[{timestamp}] {message}\n" for message in messages))
+        self.log_text.see(tk.END)
+        
     def select_directory(self):
         """Open directory selection dialog"""
         directory = filedialog.askdirectory(title="Select Directory with CSV spectral files")
@@ -267,6 +512,10 @@ class CSVConverterGUI:
             path = Path(directory)
             self.csv_files = list(path.glob('*.csv'))
             
+            # Catalog of the previous directory no longer applies
+            self.catalog = None
+            self.filter_button.config(state="disabled")
+            
             # Clear previous file list
             for widget in self.scrollable_frame.winfo_children():
                 widget.destroy()
@@ -294,6 +543,16 @@ class CSVConverterGUI:
                 self.convert_button.config(state="normal")
                 self.status_label.config(text="Ready to convert")
                 
+                # Index metadata in background so large directories stay responsive
+                if directory in self.indexing_directories:
+                    self.log("🗂️ Catalog indexing already in progress for this directory")
+                else:
+                    self.indexing_directories.add(directory)
+                    thread = threading.Thread(target=self.index_catalog,
+                                              args=(directory, list(self.csv_files)))
+                    thread.daemon = True
+                    thread.start()
+                
             else:
                 self.log("No CSV files found in selected directory")
                 self.files_count_label.config(text="No CSV files found")
@@ -304,6 +563,79 @@ class CSVConverterGUI:
             self.log(f"Error scanning directory: {str(e)}")
             messagebox.showerror("Error", f"Error scanning directory:\n{str(e)}")
             
+    def index_catalog(self, directory, csv_files):
+        """Update the SQLite catalog for a directory and enable catalog filtering"""
+        try:
+            self.log("🗂️ Updating spectral catalog...")
+            catalog = SpectraCatalog(Path(directory) / CATALOG_FILENAME)
+            indexed, unchanged, failed = catalog.update(csv_files, self.parse_csv_file)
+            self.log(f"  ✓ Catalog ready: {indexed} indexed, {unchanged} unchanged, {failed} unreadable")
+            
+            # Ignore results if another directory was selected meanwhile
+            if self.selected_directory.get() == directory:
+                self.catalog = catalog
+                self.filter_button.config(state="normal")
+                
+        except Exception as e:
+            self.log(f"  ⚠ Catalog unavailable, filtering disabled: {str(e)}")
+            
+        finally:
+            self.indexing_directories.discard(directory)
+            
+    def apply_catalog_filter(self):
+        """Select only the files matching the catalog filter fields"""
+        if self.catalog is None:
+            return
+            
+        try:
+            range_min = self.range_min_filter_var.get().strip().replace(',', '.')
+            range_max = self.range_max_filter_var.get().strip().replace(',', '.')
+            days = self.days_filter_var.get().strip()
+            
+            covers_min = float(range_min) if range_min else None
+            covers_max = float(range_max) if range_max else None
+            modified_since = None
+            if days:
+                days = float(days)
+                if not math.isfinite(days) or days < 0:
+                    raise ValueError(days)
+                modified_since = datetime.datetime.now() - datetime.timedelta(days=days)
+            
+            for value in (covers_min, covers_max):
+                if value is not None and not math.isfinite(value):
+                    raise ValueError(value)
+        except (ValueError, OverflowError):
+            messagebox.showerror("Error", "Range and days filters must be numbers")
+            return
+            
+        # Header filters use the same cleaned keys as parse_csv_file
+        metadata = {}
+        for condition in self.header_filter_var.get().split(';'):
+            if not condition.strip():
+                continue
+            if '=' not in condition:
+                messagebox.showerror("Error", f"Header filter '{condition.strip()}' must look like KEY=value")
+                return
+            key, value = condition.split('=', 1)
+            clean_key = key.strip().replace(' ', '_').replace('/', '_')
+            metadata[clean_key] = value.strip()
+            
+        try:
+            matches = self.catalog.query(title=self.title_filter_var.get().strip(),
+                                         covers_min=covers_min,
+                                         covers_max=covers_max,
+                                         modified_since=modified_since,
+                                         metadata=metadata)
+        except Exception as e:
+            self.log(f"Error querying catalog: {str(e)}")
+            messagebox.showerror("Error", f"Error querying catalog:\n{str(e)}")
+            return
+            
+        for file_path, var in self.file_vars.items():
+            var.set(file_path.name in matches)
+        self.update_selection_count()
+        self.log(f"Catalog filter matched {len(matches)} of {len(self.file_vars)} files")
+        
     def update_selection_count(self):
         """Update the count of selected files"""
         if self.file_vars:
@@ -469,6 +801,8 @@ class CSVConverterGUI:
     
     def interpolate_spectrum(self, x_original, y_original, x_target, column_name):
         """Align spectrum data onto target X axis WITHOUT interpolation - only exact matches"""
+        import numpy as np
+        
         if not x_original or not y_original:
             return [np.nan] * len(x_target)
         
@@ -497,6 +831,10 @@ class CSVConverterGUI:
     def convert_files(self, selected_files):
         """Convert selected files to unified CSV format with proper X-axis alignment (exact matches only)"""
         try:
+            # Already loaded by preload_libraries unless conversion started right away
+            import numpy as np
+            import pandas as pd
+            
             self.log(f"Starting conversion of {len(selected_files)} files...")
             
             # Dictionary to store all raw data
@@ -674,17 +1012,23 @@ class CSVConverterGUI:
             self.status_label.config(text="Ready to convert")
 
 def main():
-    """Main function to run the application"""
+    """Main function to run the application
+
+    Pass --startup-timing to report import, UI build and time-to-interactive
+    measurements on stdout and in the output log.
+    """
+    startup_timing = '--startup-timing' in sys.argv[1:]
+    ui_start = time.perf_counter()
+    
     root = tk.Tk()
-    app = CSVConverterGUI(root)
+    app = CSVConverterGUI(root, startup_timing=startup_timing)
+    app.ui_start = ui_start
+    app.ui_end = time.perf_counter()
     
-    # Center window on screen
-    root.update_idletasks()
-    width = root.winfo_width()
-    height = root.winfo_height()
-    x = (root.winfo_screenwidth() // 2) - (width // 2)
-    y = (root.winfo_screenheight() // 2) - (height // 2)
-    root.geometry(f"{width}x{height}+{x}+{y}")
+    # Center window on screen using the configured size, avoiding a forced layout pass
+    x = (root.winfo_screenwidth() // 2) - (WINDOW_WIDTH // 2)
+    y = (root.winfo_screenheight() // 2) - (WINDOW_HEIGHT // 2)
+    root.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}+{x}+{y}")
     
     root.mainloop()
 